@@ -1,8 +1,13 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, date
 import os
 import re
+import logging
+import csv
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import qrcode
 from io import BytesIO
 
@@ -28,83 +33,214 @@ st.set_page_config(
 USERS_FILE = "usuarios.csv"
 SCORES_FILE = "scores.csv"
 
+# URL pública definitiva de tu app (la que ves en el navegador)
+APP_URL = "https://2sencarcnfhwtu5sqcelv4.streamlit.app/"
+
+USERS_COLS = ["email", "nombre", "nickname", "fecha_registro"]
+HOLE_KEYS = tuple(f"hoyo_{i}" for i in range(1, 15))
+SCORES_COLS = ["fecha", "email", "nombre_mostrar", *HOLE_KEYS, "total"]
+
 # ==============================
 # CONFIG GOOGLE SHEETS
 # ==============================
 USE_GOOGLE_SHEETS = True
 GOOGLE_SHEET_NAME = "MiniClub_Scores"
 GOOGLE_WORKSHEET = "Scores"
+GSHEET_BACKLOG_MAX = 200  # filas pendientes como máximo; al llenarse se descartan las más viejas
 
-# Intentamos importar librerías de Google Sheets
-if USE_GOOGLE_SHEETS:
-    try:
-        import gspread
-        from google.oauth2.service_account import Credentials
-    except ImportError:
-        USE_GOOGLE_SHEETS = False
+logger = logging.getLogger("miniclub")
 
 
 # ==============================
 # INICIALIZAR ARCHIVOS LOCALES
 # ==============================
+@st.cache_resource(show_spinner=False)
 def init_files():
-    """Crea archivos CSV de usuarios y scores si no existen."""
+    """Crea archivos CSV de usuarios y scores si no existen (una vez por proceso)."""
     # Usuarios
     if not os.path.exists(USERS_FILE):
-        cols_users = ["email", "nombre", "nickname", "fecha_registro"]
-        pd.DataFrame(columns=cols_users).to_csv(USERS_FILE, index=False)
+        pd.DataFrame(columns=USERS_COLS).to_csv(USERS_FILE, index=False)
 
     # Scores
     if not os.path.exists(SCORES_FILE):
-        cols_scores = ["fecha", "email", "nombre_mostrar"] + \
-                      [f"hoyo_{i}" for i in range(1, 15)] + ["total"]
-        pd.DataFrame(columns=cols_scores).to_csv(SCORES_FILE, index=False)
+        pd.DataFrame(columns=SCORES_COLS).to_csv(SCORES_FILE, index=False)
 
 
 init_files()
 
 
+@st.cache_resource(show_spinner=False)
+def _csv_lock():
+    """Lock compartido por todas las sesiones del proceso para serializar escrituras a los CSV."""
+    return threading.Lock()
+
+
+def _append_csv_row_unlocked(path, row, header):
+    """Agrega una fila al final de un CSV; quien llama ya tiene _csv_lock()."""
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        # el archivo pudo borrarse o rotarse después de init_files
+        if f.tell() == 0:
+            writer.writerow(header)
+        writer.writerow(row)
+
+
+def append_csv_row(path, row, header):
+    """Agrega una fila al final de un CSV sin pasar por pandas; escribe el encabezado si está vacío."""
+    with _csv_lock():
+        _append_csv_row_unlocked(path, row, header)
+
+
 # ==============================
 # FUNCIONES GOOGLE SHEETS
 # ==============================
-def get_gsheet_client():
-    """Devuelve cliente de gspread si está configurado usando credenciales en st.secrets."""
-    if not USE_GOOGLE_SHEETS:
-        return None
+@st.cache_resource(show_spinner=False)
+def _gspread_available():
+    """Importa gspread/google-auth la primera vez que se necesitan (una vez por proceso)."""
     try:
-        scopes = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ]
-
-        # Leer el diccionario de credenciales desde secrets.toml
-        creds_info = dict(st.secrets["gcp_service_account"])
-
-        # Crear credenciales desde el diccionario (no usamos archivo .json)
-        creds = Credentials.from_service_account_info(
-            creds_info,
-            scopes=scopes
-        )
+        import gspread  # noqa: F401
+        from google.oauth2.service_account import Credentials  # noqa: F401
+    except ImportError:
+        return False
+    return True
 
-        client = gspread.authorize(creds)
-        return client
-    except Exception as e:
-        st.sidebar.warning(f"Error conectando a Google Sheets: {e}")
-        return None
 
+def gsheets_enabled():
+    """True si Google Sheets está activo y sus librerías están instaladas."""
+    return USE_GOOGLE_SHEETS and _gspread_available()
 
-def append_to_gsheet(row_list):
-    """Agrega una fila a Google Sheets (si está habilitado)."""
-    if not USE_GOOGLE_SHEETS:
+
+def get_gsheet_client():
+    """Devuelve cliente de gspread autorizado usando credenciales en st.secrets."""
+    # Importación diferida: sólo quien escribe paga el costo de cargar google-auth
+    import gspread
+    from google.oauth2.service_account import Credentials
+    from google.auth.transport.requests import AuthorizedSession
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    scopes = [
+        "https://www.googleapis.com/auth/spreadsheets",
+        "https://www.googleapis.com/auth/drive"
+    ]
+
+    # Leer el diccionario de credenciales desde secrets.toml
+    creds_info = dict(st.secrets["gcp_service_account"])
+
+    # Crear credenciales desde el diccionario (no usamos archivo .json)
+    creds = Credentials.from_service_account_info(
+        creds_info,
+        scopes=scopes
+    )
+
+    # Sesión HTTP persistente: reutiliza la conexión TLS entre appends y
+    # reintenta límites de tasa. Para POST sólo se reintenta ante 429/503 y
+    # errores de conexión previos al envío; read=False evita reintentar
+    # timeouts de lectura o conexiones cortadas, donde el append pudo aplicarse.
+    # raise_on_status=False: al agotar reintentos gspread ve la respuesta (APIError).
+    retry = Retry(
+        total=3,
+        read=False,
+        backoff_factor=0.2,
+        status_forcelist=[429, 503],
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+        raise_on_status=False
+    )
+    session = AuthorizedSession(creds)
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry))
+
+    return gspread.Client(creds, session=session)
+
+
+@st.cache_resource(show_spinner=False)
+def _gsheet_ws():
+    """Hoja de trabajo de Google Sheets, autorizada y abierta una sola vez por proceso."""
+    return get_gsheet_client().open(GOOGLE_SHEET_NAME).worksheet(GOOGLE_WORKSHEET)
+
+
+@st.cache_resource(show_spinner=False)
+def _io_pool():
+    """Pool de hilos compartido para escribir en Google Sheets sin bloquear la UI."""
+    return ThreadPoolExecutor(max_workers=2)
+
+
+@st.cache_resource(show_spinner=False)
+def _gsheet_backlog():
+    """Filas pendientes de enviar a Google Sheets, compartidas por todas las sesiones del proceso."""
+    return deque(maxlen=GSHEET_BACKLOG_MAX)
+
+
+def _drain_backlog(backlog):
+    """Saca todas las filas de la cola (deque.popleft es seguro entre hilos)."""
+    filas = []
+    while True:
+        try:
+            filas.append(backlog.popleft())
+        except IndexError:
+            return filas
+
+
+def flush_gsheet():
+    """Envía en segundo plano las filas pendientes a Google Sheets, en una sola llamada."""
+    backlog = _gsheet_backlog()
+    if not backlog or not gsheets_enabled():
         return
-    client = get_gsheet_client()
-    if client is None:
+    from gspread.exceptions import SpreadsheetNotFound, WorksheetNotFound
+
+    try:
+        ws = _gsheet_ws()
+    except (KeyError, FileNotFoundError, SpreadsheetNotFound, WorksheetNotFound) as e:
+        # error de configuración (secrets, nombre de hoja): reintentar no sirve
+        filas = _drain_backlog(backlog)
+        logger.error("Google Sheets mal configurado (%r); filas no enviadas: %s", e, filas)
+        st.sidebar.warning(f"Google Sheets mal configurado: {e!r}")
+        return
+    except Exception as e:
+        # error temporal: las filas quedan en la cola del proceso para el próximo envío
+        logger.warning("Error conectando a Google Sheets: %s", e)
+        st.sidebar.warning(f"Error conectando a Google Sheets: {e}")
         return
+    # el hilo no toca st.*: recibe la hoja y la cola ya resueltas
+    _io_pool().submit(_gsheet_append_job, ws, _drain_backlog(backlog), backlog)
+
+
+def _append_no_aplicado(error):
+    """True si el error garantiza que Google no escribió las filas (reenviarlas no duplica)."""
+    from gspread.exceptions import APIError
+    from requests.exceptions import ConnectTimeout, ConnectionError
+    from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+    if isinstance(error, APIError):
+        return error.response.status_code in (429, 503)
+    if isinstance(error, ConnectTimeout):
+        return True
+    if isinstance(error, ConnectionError):
+        # sólo fallos al abrir la conexión; un ProtocolError llega sin MaxRetryError
+        causa = error.args[0] if error.args else None
+        return isinstance(causa, MaxRetryError) and isinstance(causa.reason, NewConnectionError)
+    return False
+
+
+def _gsheet_append_job(ws, filas, backlog):
+    """Corre en el pool: envía las filas una vez (los reintentos los hace la sesión HTTP)."""
     try:
-        sheet = client.open(GOOGLE_SHEET_NAME).worksheet(GOOGLE_WORKSHEET)
-        sheet.append_row(row_list, value_input_option="USER_ENTERED")
+        ws.append_rows(filas, value_input_option="USER_ENTERED")
     except Exception as e:
-        st.sidebar.warning(f"Error al escribir en Google Sheets: {e}")
+        if _append_no_aplicado(e):
+            logger.warning("Google Sheets no aceptó %d fila(s), quedan en la cola: %s", len(filas), e)
+            backlog.extend(filas)
+        else:
+            # timeout, 5xx, conexión cortada: el append pudo aplicarse, no se reenvía
+            logger.error("Resultado incierto al escribir en Google Sheets (%s); filas no reenviadas: %s",
+                         e, filas)
+
+
+def append_to_gsheet(row_list):
+    """Envía una fila a Google Sheets (si está habilitado) junto con las que hayan quedado pendientes."""
+    if not gsheets_enabled():
+        return
+    _gsheet_backlog().append(row_list)
+    flush_gsheet()
 
 
 # ==============================
@@ -113,73 +249,101 @@ def append_to_gsheet(row_list):
 if "user" not in st.session_state:
     st.session_state["user"] = None  # dict con email, nombre, nickname
 
-def load_users():
+@st.cache_data(show_spinner=False)
+def _read_csv_cached(path, mtime):
+    """Lee un CSV; el mtime forma parte de la clave para invalidar la caché al modificarse."""
+    return pd.read_csv(path)
+
+
+@st.cache_data(show_spinner=False)
+def _users_index(mtime):
+    """Índice email -> datos del usuario, para búsquedas O(1) en el login."""
+    df = _read_csv_cached(USERS_FILE, mtime)
+    index = {}
+    for r in df.itertuples(index=False):
+        # ante emails repetidos gana la primera fila, como el antiguo iloc[0]
+        index.setdefault(r.email, r._asdict())
+    return index
+
+
+def find_user(email):
+    """Devuelve el dict del usuario con ese email (ya normalizado) o None."""
     try:
-        return pd.read_csv(USERS_FILE)
+        return _users_index(os.path.getmtime(USERS_FILE)).get(email)
     except Exception:
-        return pd.DataFrame(columns=["email", "nombre", "nickname", "fecha_registro"])
+        return None
 
 
 def save_users(df):
     df.to_csv(USERS_FILE, index=False)
+    _read_csv_cached.clear()
+    _users_index.clear()
 
 
 def login_or_register(email, nombre="", nickname=""):
-    """Crea o actualiza usuario y lo guarda en sesión."""
-    df = load_users()
-    email = email.strip().lower()
-
-    if email in df["email"].values:
-        # Usuario existente: actualizamos datos opcionales
-        user_row = df[df["email"] == email].iloc[0].to_dict()
-        if nombre.strip():
-            user_row["nombre"] = nombre.strip()
-        if nickname.strip():
-            user_row["nickname"] = nickname.strip()
-        df.loc[df["email"] == email, ["nombre", "nickname"]] = [
-            user_row.get("nombre", ""), user_row.get("nickname", "")
-        ]
-        save_users(df)
-    else:
-        # Usuario nuevo
-        fecha_registro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        nueva = {
-            "email": email,
-            "nombre": nombre.strip(),
-            "nickname": nickname.strip(),
-            "fecha_registro": fecha_registro
-        }
-        df = pd.concat([df, pd.DataFrame([nueva])], ignore_index=True)
-        save_users(df)
-        user_row = nueva
+    """Crea o actualiza usuario y lo guarda en sesión (email ya normalizado)."""
+    nombre = nombre.strip()
+    nickname = nickname.strip()
+
+    # buscar y escribir bajo el mismo lock: dos sesiones no pueden registrar el mismo email
+    with _csv_lock():
+        # releer el archivo: el índice cacheado puede estar desactualizado
+        try:
+            df = pd.read_csv(USERS_FILE)
+        except FileNotFoundError:
+            df = pd.DataFrame(columns=USERS_COLS)
+        existentes = df.loc[df["email"] == email]
+
+        if not existentes.empty:
+            # Usuario existente: actualizamos datos opcionales
+            user_row = existentes.iloc[0].to_dict()
+            cambios = False
+            if nombre and nombre != user_row.get("nombre"):
+                user_row["nombre"] = nombre
+                cambios = True
+            if nickname and nickname != user_row.get("nickname"):
+                user_row["nickname"] = nickname
+                cambios = True
+            # sólo reescribimos el CSV si algún dato cambió
+            if cambios:
+                df.loc[df["email"] == email, ["nombre", "nickname"]] = [
+                    user_row.get("nombre", ""), user_row.get("nickname", "")
+                ]
+                save_users(df)
+        else:
+            # Usuario nuevo: append de una línea, sin reconstruir el DataFrame
+            fecha_registro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            user_row = {
+                "email": email,
+                "nombre": nombre,
+                "nickname": nickname,
+                "fecha_registro": fecha_registro
+            }
+            _append_csv_row_unlocked(USERS_FILE, user_row.values(), USERS_COLS)
+            _read_csv_cached.clear()
+            _users_index.clear()
 
     st.session_state["user"] = user_row
     return user_row
 
 
 def login_user(email):
-    """Loguea un usuario existente (sin crear)."""
-    df = load_users()
-    email = email.strip().lower()
-    if email in df["email"].values:
-        user_row = df[df["email"] == email].iloc[0].to_dict()
+    """Loguea un usuario existente (sin crear); el email llega ya normalizado."""
+    user_row = find_user(email)
+    if user_row is not None:
         st.session_state["user"] = user_row
-        return user_row
-    return None
+    return user_row
 
 
 def logout_user():
-    """Cierra sesión y limpia keys relevantes."""
+    """Cierra sesión y limpia keys relevantes (callback del botón; Streamlit hace el rerun)."""
     st.session_state["user"] = None
     # limpiar inputs de hoyos si existen
-    for i in range(1, 15):
-        key = f"hoyo_{i}"
-        if key in st.session_state:
-            del st.session_state[key]
+    for key in HOLE_KEYS:
+        st.session_state.pop(key, None)
     # solicitar cambio de menú al próximo rerun (no tocar 'menu' si el widget ya existe)
     st.session_state["menu_request"] = "Iniciar sesión / Registro"
     st.sidebar.info("Sesión cerrada.")
-    safe_rerun()
 
 
 def get_display_name(user):
@@ -199,20 +363,74 @@ def get_display_name(user):
 EMAIL_RE = re.compile(r"[^@]+@[^@]+\.[^@]+")
 
 
+# ==============================
+# RANKING
+# ==============================
+RANKING_COLS = ["fecha", "email", "nombre_mostrar", "total"]
+
+
+@st.cache_data(show_spinner=False)
+def _read_scores_ranking(path, mtime):
+    """Lee sólo las columnas del ranking (sin los 14 hoyos), con fechas ya parseadas."""
+    return pd.read_csv(
+        path,
+        usecols=RANKING_COLS,
+        parse_dates=["fecha"],
+        dtype={"total": "int32"}
+    )
+
+
+# filtros con ventana móvil (días hacia atrás desde ahora)
+VENTANAS_MOVILES = {"Últimos 7 días": 7, "Últimos 30 días": 30}
+
+
+def _top50(df):
+    """Los 50 mejores puntajes con su posición."""
+    # sólo necesitamos los 50 mejores: selección parcial en vez de ordenar todo
+    df = df.nsmallest(50, "total")  # menor total = mejor posición
+    df["pos"] = range(1, len(df) + 1)
+    return df[["pos", "fecha", "nombre_mostrar", "email", "total"]]
+
+
+@st.cache_data(show_spinner=False)
+def _ranking_view(mtime, filtro, day_bucket):
+    """Top 50 para "Histórico" y "Hoy"; day_bucket hace que la caché expire al cambiar de día."""
+    df = _read_scores_ranking(SCORES_FILE, mtime)
+    if filtro == "Hoy":
+        df = df.loc[df["fecha"] >= pd.Timestamp(date.fromordinal(day_bucket))]
+    return _top50(df)
+
+
+def ranking_view(mtime, filtro):
+    """Top 50 del ranking; las ventanas móviles se filtran contra la hora actual, fuera de la caché."""
+    if filtro in VENTANAS_MOVILES:
+        df = _read_scores_ranking(SCORES_FILE, mtime)
+        desde = pd.Timestamp.now() - pd.Timedelta(days=VENTANAS_MOVILES[filtro])
+        return _top50(df.loc[df["fecha"] >= desde])
+    return _ranking_view(mtime, filtro, date.today().toordinal())
+
+
 # ==============================
 # HEADER CON LOGO
 # ==============================
 logo_path = "logo_miniclub.png"  # pon aquí el nombre de tu archivo de logo
+LOGO_EXISTS = os.path.exists(logo_path)
 
-cols_header = st.columns([1, 3])
-with cols_header[0]:
-    if os.path.exists(logo_path):
+if LOGO_EXISTS:
+    cols_header = st.columns([1, 3])
+    with cols_header[0]:
         st.image(logo_path, use_container_width=True)
-with cols_header[1]:
-    st.title("MiniClub ⛳")
-    st.write("Portal de jugadores y sistema de puntaje para Mini Golf (14 hoyos).")
-
-st.divider()
+    with cols_header[1]:
+        st.title("MiniClub ⛳")
+        st.write("Portal de jugadores y sistema de puntaje para Mini Golf (14 hoyos).")
+    st.divider()
+else:
+    # sin logo no hace falta el layout de columnas: un solo elemento
+    st.markdown(
+        "# MiniClub ⛳\n"
+        "Portal de jugadores y sistema de puntaje para Mini Golf (14 hoyos).\n\n"
+        "---"
+    )
 
 
 # ==============================
@@ -226,8 +444,14 @@ else:
     u = st.session_state["user"]
     st.sidebar.success(f"Conectado: {get_display_name(u)}")
     st.sidebar.write(u.get("email", ""))
-    if st.sidebar.button("Cerrar sesión"):
-        logout_user()
+    st.sidebar.button("Cerrar sesión", on_click=logout_user)
+
+# puntajes de cualquier sesión que no llegaron a Google Sheets
+n_pendientes = len(_gsheet_backlog())
+if n_pendientes:
+    st.sidebar.caption(f"{n_pendientes} puntaje(s) pendientes de sincronizar con Google Sheets.")
+    if st.sidebar.button("Sincronizar"):
+        flush_gsheet()
 
 st.sidebar.header("Menú")
 
@@ -261,12 +485,13 @@ if menu == "Iniciar sesión / Registro":
             email_login = st.text_input("Correo electrónico")
             submit_login = st.form_submit_button("Entrar")
             if submit_login:
-                if not email_login.strip():
+                email_clean = email_login.strip().lower()
+                if not email_clean:
                     st.error("Ingresa tu correo electrónico.")
-                elif not EMAIL_RE.match(email_login.strip()):
+                elif not EMAIL_RE.fullmatch(email_clean):
                     st.error("Correo electrónico inválido.")
                 else:
-                    user = login_user(email_login)
+                    user = login_user(email_clean)
                     if user:
                         st.success(f"Bienvenido, {get_display_name(user)}")
                         # pedir cambio de pantalla de forma segura
@@ -283,12 +508,13 @@ if menu == "Iniciar sesión / Registro":
             nick_reg = st.text_input("Nickname / apodo (opcional)", key="reg_nick")
             submit_reg = st.form_submit_button("Registrarme")
             if submit_reg:
-                if not email_reg.strip():
+                email_clean = email_reg.strip().lower()
+                if not email_clean:
                     st.error("El correo electrónico es obligatorio.")
-                elif not EMAIL_RE.match(email_reg.strip()):
+                elif not EMAIL_RE.fullmatch(email_clean):
                     st.error("Correo electrónico inválido.")
                 else:
-                    user = login_or_register(email_reg, nombre_reg, nick_reg)
+                    user = login_or_register(email_clean, nombre_reg, nick_reg)
                     st.success(f"Usuario creado. Bienvenido, {get_display_name(user)}")
                     # pedir cambio de pantalla de forma segura
                     st.session_state["menu_request"] = "Registrar puntaje"
@@ -312,33 +538,31 @@ if menu == "Registrar puntaje":
     st.write(f"Jugador: **{display_name}** ({user_email})")
 
     st.info("Ingresa los golpes por cada hoyo (1 a 14). Usa el formulario para guardar.")
-    golpes = []
     cols = st.columns(4)
 
-    # Usar form para agrupar inputs
+    # Usar form para agrupar inputs; los valores se leen de session_state al guardar
     with st.form("form_puntaje"):
-        for i in range(1, 15):
-            col = cols[(i - 1) % 4]
-            with col:
-                valor = st.number_input(
+        for i, key in enumerate(HOLE_KEYS, start=1):
+            with cols[(i - 1) % 4]:
+                st.number_input(
                     f"Hoyo {i}",
                     min_value=1,
                     max_value=20,
                     value=3,
-                    key=f"hoyo_{i}"
+                    key=key
                 )
-                golpes.append(valor)
 
         submit_puntaje = st.form_submit_button("Guardar puntaje")
         if submit_puntaje:
+            golpes = [st.session_state[key] for key in HOLE_KEYS]
             total = sum(golpes)
             fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-            # Guardar en CSV local
-            df_scores = pd.read_csv(SCORES_FILE)
+            # Guardar en CSV local (append de una línea)
             nueva_fila = [fecha, user_email, display_name] + golpes + [total]
-            df_scores.loc[len(df_scores)] = nueva_fila
-            df_scores.to_csv(SCORES_FILE, index=False)
+            append_csv_row(SCORES_FILE, nueva_fila, SCORES_COLS)
+            _read_scores_ranking.clear()
+            _ranking_view.clear()
 
             # Guardar también en Google Sheets (si está activo)
             append_to_gsheet(nueva_fila)
@@ -354,57 +578,45 @@ if menu == "Registrar puntaje":
 elif menu == "Ver ranking":
     st.subheader("🏆 Ranking de jugadores")
 
-    df = pd.read_csv(SCORES_FILE)
+    try:
+        mtime = os.path.getmtime(SCORES_FILE)
+    except FileNotFoundError:
+        mtime = None  # se recrea con encabezado al guardar el próximo puntaje
+    historico = ranking_view(mtime, "Histórico") if mtime is not None else None
 
-    if df.empty:
+    if historico is None or historico.empty:
         st.info("Todavía no hay partidas registradas.")
     else:
-        df["fecha_dt"] = pd.to_datetime(df["fecha"])
-
         filtro = st.selectbox(
             "Mostrar ranking de:",
             ["Histórico", "Hoy", "Últimos 7 días", "Últimos 30 días"]
         )
 
-        ahora = datetime.now()
-        if filtro == "Hoy":
-            df = df[df["fecha_dt"].dt.date == ahora.date()]
-        elif filtro == "Últimos 7 días":
-            df = df[df["fecha_dt"] >= ahora - pd.Timedelta(days=7)]
-        elif filtro == "Últimos 30 días":
-            df = df[df["fecha_dt"] >= ahora - pd.Timedelta(days=30)]
+        if filtro == "Histórico":
+            mostrar = historico
+        else:
+            mostrar = ranking_view(mtime, filtro)
 
-        if df.empty:
+        if mostrar.empty:
             st.info("No hay registros en este rango de tiempo.")
         else:
-            df = df.sort_values("total")  # menor total = mejor posición
-            df["pos"] = range(1, len(df) + 1)
-
-            mostrar = df[["pos", "fecha", "nombre_mostrar", "email", "total"]].head(50)
             st.write("Menor número de golpes = mejor posición.")
             st.dataframe(mostrar, hide_index=True)
 # ==============================
 # ACCESO RÁPIDO (QR)
 # ==============================
-import qrcode
-from io import BytesIO
-
-# URL pública definitiva de tu app (la que ves en el navegador)
-APP_URL = "https://2sencarcnfhwtu5sqcelv4.streamlit.app/"
-
+@st.cache_data(show_spinner=False)
 def make_qr_bytes(url: str, box_size: int = 6):
+    """Genera el PNG del QR; se cachea porque la URL no cambia entre reruns."""
     qr = qrcode.QRCode(border=2, box_size=box_size)
     qr.add_data(url)
     qr.make(fit=True)
     img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
     buf = BytesIO()
     img.save(buf, format="PNG")
-    buf.seek(0)
-    return buf
-
-qr_buf = make_qr_bytes(APP_URL, box_size=6)
+    return buf.getvalue()
 
-with st.sidebar:
-    st.markdown("### Acceso rápido (QR)")
-    st.image(qr_buf, width=160)
+# dentro de un expander cerrado el navegador no pinta el QR hasta que se abre
+with st.sidebar.expander("Acceso rápido (QR)", expanded=False):
+    st.image(make_qr_bytes(APP_URL, box_size=6), width=160)
     st.caption(APP_URL)